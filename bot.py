@@ -1,10 +1,16 @@
 import os
+import asyncio
 import logging
 import base64
+import functools
+import hashlib
 import json
+import re
+import threading
 from datetime import datetime
 import gspread
 from google.oauth2.service_account import Credentials
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ApplicationBuilder, CommandHandler, CallbackQueryHandler, ContextTypes, MessageHandler, filters, ConversationHandler
 
@@ -20,142 +26,395 @@ CATEGORY, AMOUNT_AND_DESCRIPTION = range(2)
 # Constants
 BOT_TOKEN = os.environ["BOT_TOKEN"]
 SPREADSHEET_ID = os.environ["SPREADSHEET_ID"]
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+MONTH_TITLE_PATTERN = re.compile(
+    r"^(January|February|March|April|May|June|July|August|September|October|November|December) \d{4}$"
+)  # Cheap pre-check for "%B %Y" worksheet titles before calling strptime
+AMOUNT_PATTERN = re.compile(r"^\s*(-?[\d.,]+)\s*(.*)$", re.DOTALL)  # "[amount] [description]" message
+# Hash of the last command list sent to Telegram; /tmp is wiped on restart, point it at a volume to persist
+COMMANDS_HASH_FILE = os.environ.get("COMMANDS_HASH_FILE", "/tmp/bot_commands.sha256")
+RETRYABLE_STATUS_CODES = {429, 500, 503}  # Google Sheets quota and transient server errors
+ROW_WINDOW_SIZE = 50  # Rows read past the cached position when looking for the next empty cell
+COLUMN_LETTERS = {col: gspread.utils.rowcol_to_a1(1, col)[:-1] for col in range(1, 41)}  # Monthly sheets have 40 columns
+
+def load_google_creds():
+    """Decode the base64 service account JSON from the environment into credentials"""
+    try:
+        creds_dict = json.loads(base64.b64decode(os.environ["GOOGLE_CREDS_JSON"]).decode("utf-8"))
+        return Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
+    except (KeyError, ValueError) as e:
+        raise RuntimeError("GOOGLE_CREDS_JSON must contain base64-encoded service account JSON") from e
+
+# Decode the service account credentials once at startup
+GOOGLE_CREDS = load_google_creds()
 
 category_map = {}  # category name -> column index
 current_month_cache = None  # Cache for current month to avoid repeated calls
+next_row_cache = {}  # column index -> last known next empty row, where the per-expense window read starts
+worksheet_cache = None  # Current month worksheet, reused until the month changes
+spreadsheet_url_cache = None  # Link to the current month tab
+spreadsheet_cache = None  # Authorized spreadsheet handle, created once and reused
+write_lock = threading.Lock()  # Keeps choosing the next row and writing to it together as one step
+setup_lock = threading.RLock()  # Serializes month rollover and worksheet loading between non-blocking handlers' worker threads
+
+# Main keyboard that will be shown for quick access, built once and reused
+MAIN_KEYBOARD = ReplyKeyboardMarkup(
+    [
+        ["➕ Add Expense", "📊 Categories"],
+        ["📝 Open Spreadsheet", "ℹ️ Help"]
+    ],
+    resize_keyboard=True
+)
 
-# Create main keyboard that will be shown for quick access
-def get_main_keyboard():
-    return ReplyKeyboardMarkup(
-        [
-            ["➕ Add Expense", "📊 Categories"],
-            ["📝 Open Spreadsheet", "ℹ️ Help"]
-        ],
-        resize_keyboard=True
-    )
+@functools.lru_cache(maxsize=4)
+def build_category_keyboard(categories):
+    """Build the category selection keyboard for a tuple of sorted category names"""
+    # Create a keyboard with 2 categories per row
+    keyboard = [
+        [InlineKeyboardButton(category, callback_data=f"cat_{category}") for category in categories[i:i + 2]]
+        for i in range(0, len(categories), 2)
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+def get_category_keyboard():
+    # Sort categories alphabetically for better user experience
+    return build_category_keyboard(tuple(sorted(category_map.keys())))
 
 # Google Sheets Setup
+def column_letter(col):
+    """A1 column letter for a 1-based column index, precomputed for the usual sheet width"""
+    return COLUMN_LETTERS.get(col) or gspread.utils.rowcol_to_a1(1, col)[:-1]
+
+def is_retryable_api_error(exception):
+    return (
+        isinstance(exception, gspread.exceptions.APIError)
+        and exception.response.status_code in RETRYABLE_STATUS_CODES
+    )
+
+# Retry throttled or failed Google Sheets requests with exponential backoff
+sheets_retry = retry(
+    retry=retry_if_exception(is_retryable_api_error),
+    wait=wait_exponential_jitter(initial=0.5, max=8),
+    stop=stop_after_attempt(5),
+    reraise=True
+)
+
 def get_sheets_client():
-    scope = ["https://www.googleapis.com/auth/spreadsheets"]
-    b64_data = os.environ["GOOGLE_CREDS_JSON"]
-    json_str = base64.b64decode(b64_data).decode("utf-8")
-    creds_dict = json.loads(json_str)
-    creds = Credentials.from_service_account_info(creds_dict, scopes=scope)
-    return gspread.authorize(creds)
+    return gspread.authorize(GOOGLE_CREDS)
+
+@sheets_retry
+def open_spreadsheet_by_key(client):
+    return client.open_by_key(SPREADSHEET_ID)
+
+def get_spreadsheet():
+    """Authorize and open the spreadsheet once, then reuse the handle"""
+    global spreadsheet_cache
+    if spreadsheet_cache is None:
+        client = get_sheets_client()
+        spreadsheet_cache = open_spreadsheet_by_key(client)
+        logging.info("Opened spreadsheet and cached the handle")
+    return spreadsheet_cache
 
 def get_current_month():
     """Get current month and cache it to avoid repeated datetime calls"""
-    global current_month_cache
     current_month = datetime.now().strftime("%B %Y")
     
     # If month changed, clear category cache to force reload
     if current_month_cache != current_month:
-        global category_map
-        category_map = {}
-        current_month_cache = current_month
-        logging.info(f"Month changed to {current_month}, cleared category cache")
+        with setup_lock:
+            clear_month_caches(current_month)
     
     return current_month
 
+def clear_month_caches(current_month):
+    """Reset the per-month caches, must be called with setup_lock held"""
+    global current_month_cache, category_map, next_row_cache, worksheet_cache, spreadsheet_url_cache
+    # Another thread may have already handled the rollover while we waited for the lock
+    if current_month_cache != current_month:
+        category_map = {}
+        next_row_cache = {}
+        worksheet_cache = None
+        spreadsheet_url_cache = None
+        build_category_keyboard.cache_clear()
+        current_month_cache = current_month
+        logging.info(f"Month changed to {current_month}, cleared category, row and worksheet caches")
+
 def setup_monthly_worksheet():
-    global category_map
-    current_month_tab = get_current_month()  # Get current month dynamically
-    client = get_sheets_client()
-    sheet = client.open_by_key(SPREADSHEET_ID)
+    get_current_month()  # Clears the caches if the month rolled over
+
+    # Reuse the worksheet and categories already loaded for this month; take one snapshot
+    # so a rollover in another thread can't swap the cache out between the check and the return
+    worksheet = worksheet_cache
+    if worksheet is not None and category_map:
+        return worksheet
+
+    # Only one thread loads or creates the worksheet, the others wait and reuse its result
+    with setup_lock:
+        current_month_tab = get_current_month()
+        if worksheet_cache is not None and category_map:
+            return worksheet_cache
+        return load_monthly_worksheet(current_month_tab)
+
+def invalidate_worksheet_cache(worksheet):
+    """Drop the cached worksheet if it is still the given one, so the next call reloads or recreates the tab"""
+    global category_map, worksheet_cache, spreadsheet_url_cache
+    with setup_lock:
+        if worksheet_cache is worksheet:
+            worksheet_cache = None
+            category_map = {}
+            spreadsheet_url_cache = None
+            logging.warning(f"Dropped cached worksheet {worksheet.title} after an API error")
+
+def load_monthly_worksheet(current_month_tab):
+    global category_map, worksheet_cache
+    sheet = get_spreadsheet()
 
     try:
         # Try to get the current month worksheet
-        worksheet = sheet.worksheet(current_month_tab)
+        worksheet = get_worksheet_by_title(sheet, current_month_tab)
+        headers = None
+        data_rows = None
         logging.info(f"Using existing worksheet for {current_month_tab}")
     except gspread.exceptions.WorksheetNotFound:
         # If it doesn't exist, create it and copy the headers from the previous month
         logging.info(f"Creating new worksheet for {current_month_tab}")
         
-        # Create the new worksheet first
+        # Create the new worksheet first; not retried since a repeated add_worksheet would fail as a duplicate
         worksheet = sheet.add_worksheet(title=current_month_tab, rows=1000, cols=40)
-        
-        # Get all worksheets and find the most recent previous month
-        all_worksheets = sheet.worksheets()
-        previous_worksheet = None
-        
-        # Look for worksheets with month-year format and find the most recent one
-        for ws in all_worksheets:
-            if ws.title != current_month_tab and ws.title != "Sheet1":  # Skip default sheet
-                try:
-                    # Try to parse the worksheet title as a date to find previous months
-                    datetime.strptime(ws.title, "%B %Y")
-                    previous_worksheet = ws
-                    break  # Use the first valid month worksheet found
-                except ValueError:
-                    continue  # Skip non-date worksheets
+        headers = []
+        data_rows = []
+
+        # Fetch only the worksheet titles in one metadata request
+        metadata = fetch_worksheet_titles(sheet)
+        previous_title = None
+        previous_date = None
+        current_month_date = datetime.strptime(current_month_tab, "%B %Y")
+
+        # Look for worksheets with month-year format and find the most recent previous one
+        for sheet_data in metadata.get("sheets", []):
+            title = sheet_data["properties"]["title"]
+            # Skip non-date worksheets (e.g. the default "Sheet1") without parsing them
+            if not MONTH_TITLE_PATTERN.match(title):
+                continue
+            # Parse the worksheet title as a date, ignoring the current month and any future ones
+            title_date = datetime.strptime(title, "%B %Y")
+            if title_date >= current_month_date:
+                continue
+            if previous_date is None or title_date > previous_date:
+                previous_title = title
+                previous_date = title_date
         
         # If we found a previous month worksheet, copy its header row
-        if previous_worksheet:
-            logging.info(f"Found previous worksheet: {previous_worksheet.title}")
+        if previous_title:
+            logging.info(f"Found previous worksheet: {previous_title}")
             
             # Get the first row (header row) from the previous worksheet
-            header_row = previous_worksheet.row_values(1)
+            header_row = read_header_row(sheet, previous_title)
             
             # If the header has content, copy it to our new worksheet
             if header_row and any(cell.strip() for cell in header_row if cell):
                 # Update the entire first row at once
-                worksheet.update('A1', [header_row])
-                logging.info(f"Copied header row from {previous_worksheet.title}: {header_row}")
+                write_header_row(worksheet, header_row)
+                headers = header_row
+                logging.info(f"Copied header row from {previous_title}: {header_row}")
             else:
-                logging.warning(f"No valid headers found in {previous_worksheet.title}")
+                logging.warning(f"No valid headers found in {previous_title}")
         else:
             logging.warning("No previous month worksheet found to copy headers from")
 
-    # Always rescan categories from the current worksheet
-    headers = worksheet.row_values(1)
+    # Read the header row and the expense rows of an existing worksheet in one request;
+    # a new one already has the copied headers and no expenses yet
+    if headers is None:
+        header_range, data_range = read_monthly_values(sheet, current_month_tab)
+        headers = header_range.get("values", [[]])[0]
+        data_rows = data_range.get("values", [])
     
-    # Clear and rebuild category map
-    category_map = {}
+    # Rebuild the category map and swap it in at once so other threads never see it half-filled
+    new_category_map = {}
     for col_index, value in enumerate(headers, start=1):
         if value and value.strip():  # Check for both None and empty strings
-            category_map[value.strip()] = col_index
+            new_category_map[value.strip()] = col_index
+    category_map = new_category_map
     
     logging.info(f"Rescanned categories for {current_month_tab}: Found {len(category_map)} categories: {list(category_map.keys())}")
-    
+
+    seed_next_row_cache(data_rows)
+    worksheet_cache = worksheet
     return worksheet
 
 
-def add_expense_to_sheet(category, amount_description):
-    worksheet = setup_monthly_worksheet()
+@sheets_retry
+def get_worksheet_by_title(sheet, title):
+    return sheet.worksheet(title)
 
-    if category not in category_map:
-        raise ValueError(f"Category '{category}' not found in spreadsheet.")
 
-    category_col = category_map[category]
-    description_col = category_col + 1  # Assuming description is always in next column
-    
-    # Get all values in the category column to find first empty cell
-    col_values = worksheet.col_values(category_col)
-
-    # Find the first empty row
-    start_row = 2
-    for i, value in enumerate(col_values[1:], start=2):
-        if value.strip():
-            start_row = i + 1
-        else:
-            break
+@sheets_retry
+def fetch_worksheet_titles(sheet):
+    return sheet.fetch_sheet_metadata(params={"fields": "sheets.properties.title"})
+
+
+@sheets_retry
+def read_header_row(sheet, title):
+    return sheet.values_get(f"'{title}'!1:1").get("values", [[]])[0]
+
+
+@sheets_retry
+def write_header_row(worksheet, header_row):
+    worksheet.update('A1', [header_row])
+
+
+@sheets_retry
+def read_monthly_values(sheet, current_month_tab):
+    """Read the header row and the expense rows below it in one request"""
+    response = sheet.values_batch_get([f"'{current_month_tab}'!1:1", f"'{current_month_tab}'!A2:ZZ"])
+    return response["valueRanges"]
+
+
+@sheets_retry
+def read_column_window(worksheet, cell_range):
+    return worksheet.get(cell_range)
+
+
+@sheets_retry
+def write_expense_cells(worksheet, cell_range, amount, description):
+    """Write an expense to an already chosen range, safe to retry since it rewrites the same cells"""
+    worksheet.update(
+        range_name=cell_range,
+        values=[[amount, description]],
+        value_input_option="USER_ENTERED"
+    )
+
+
+def seed_next_row_cache(data_rows):
+    """Find the first empty row of every category column from the rows below the header"""
+    global next_row_cache
+    new_next_row_cache = {}
+
+    for category_col in category_map.values():
+        start_row = 2
+        for i, row in enumerate(data_rows, start=2):
+            value = row[category_col - 1] if len(row) >= category_col else ""
+            if value.strip():
+                start_row = i + 1
+            else:
+                break
+        new_next_row_cache[category_col] = start_row
+    next_row_cache = new_next_row_cache
+
+    logging.info(f"Seeded next empty rows: {next_row_cache}")
+
+
+def find_next_empty_row(worksheet, category_col):
+    """Confirm the cached next empty row with a small windowed read, in case the sheet was edited by hand
+
+    This costs one read per expense, traded for never overwriting rows entered directly in the sheet.
+    The window starts one row above the cached position so a hand-deleted last entry gets reused.
+    """
+    start_row = max(2, next_row_cache.get(category_col, 2) - 1)
+    col_letter = column_letter(category_col)
+
+    while True:
+        end_row = start_row + ROW_WINDOW_SIZE - 1
+        window = read_column_window(worksheet, f"{col_letter}{start_row}:{col_letter}{end_row}")
+
+        # Trailing empty rows are omitted from the response, so a short window ends in an empty row
+        empty_offsets = [offset for offset, row in enumerate(window) if not row or not row[0].strip()]
+        if len(window) < ROW_WINDOW_SIZE:
+            empty_offsets.append(len(window))
+
+        if empty_offsets:
+            if empty_offsets[0] == 0 and start_row > 2:
+                # The row above the cached position is empty too, more entries may have been deleted
+                return find_last_empty_row_above(worksheet, col_letter, start_row)
+            return start_row + empty_offsets[0]
+
+        # The whole window is filled, slide it further down
+        start_row = end_row + 1
 
-    # Split amount and description
-    amount, *description_parts = amount_description.split(" ", 1)
-    description = description_parts[0] if description_parts else ""
+
+def find_last_empty_row_above(worksheet, col_letter, empty_row):
+    """Walk back from a known empty row to the row right after the last filled one"""
+    while empty_row > 2:
+        start_row = max(2, empty_row - ROW_WINDOW_SIZE)
+        window = read_column_window(worksheet, f"{col_letter}{start_row}:{col_letter}{empty_row - 1}")
+
+        for offset in range(len(window) - 1, -1, -1):
+            if window[offset] and window[offset][0].strip():
+                return start_row + offset + 1
+
+        # Nothing filled in this window, keep walking up
+        empty_row = start_row
+
+    return 2
+
+
+def add_expense_to_sheet(category, amount, description):
+    with write_lock:
+        worksheet = setup_monthly_worksheet()
+
+        if category not in category_map:
+            raise ValueError(f"Category '{category}' not found in spreadsheet.")
+
+        category_col = category_map[category]
+        description_col = category_col + 1  # Assuming description is always in next column
     
-    logging.info(f"Adding expense: {amount} to {category} (col {category_col}) at row {start_row}")
+        try:
+            start_row = find_next_empty_row(worksheet, category_col)
+
+            logging.info(f"Adding expense: {amount} to {category} (col {category_col}) at row {start_row}")
+        
+            # Update both adjacent cells in a single request
+            cell_range = f"{column_letter(category_col)}{start_row}:{column_letter(description_col)}{start_row}"
+            write_expense_cells(worksheet, cell_range, amount, description)
+        except gspread.exceptions.APIError as e:
+            # The month tab may have been renamed or deleted, reload it on the next call
+            if not is_retryable_api_error(e):
+                invalidate_worksheet_cache(worksheet)
+            raise
+        next_row_cache[category_col] = start_row + 1
+
+
+def get_spreadsheet_url():
+    """Build a URL that opens the spreadsheet on the current month tab"""
+    global spreadsheet_url_cache
+    current_month_tab = get_current_month()  # Get current month dynamically
+
+    spreadsheet_url = spreadsheet_url_cache
+    if spreadsheet_url is not None:
+        return current_month_tab, spreadsheet_url
+
+    # Build and store the link under setup_lock so a rollover can't leave last month's link cached
+    with setup_lock:
+        current_month_tab = get_current_month()
+        if spreadsheet_url_cache is None:
+            # Reuse the cached monthly worksheet, creating it with headers if needed
+            worksheet = setup_monthly_worksheet()
+
+            # Create URL that opens directly to the current month tab
+            spreadsheet_url = f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/edit#gid={worksheet.id}"
+            if current_month_cache == current_month_tab:
+                spreadsheet_url_cache = spreadsheet_url
+        else:
+            spreadsheet_url = spreadsheet_url_cache
     
-    # Update the cells
-    worksheet.update_cell(start_row, category_col, amount)
-    worksheet.update_cell(start_row, description_col, description)
+    return current_month_tab, spreadsheet_url
+
+
+async def run_blocking(func, *args):
+    """Run a blocking Google Sheets call in a worker thread so the event loop stays responsive"""
+    return await asyncio.to_thread(func, *args)
+
+
+async def ensure_categories_loaded():
+    """Load the monthly worksheet if the categories aren't cached yet"""
+    if not category_map:
+        await run_blocking(setup_monthly_worksheet)
 
 
 # Bot commands
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     print("Start command received!")
-    if not category_map:
-        setup_monthly_worksheet()
+    await ensure_categories_loaded()
 
     await update.message.reply_text(
         "Welcome to the Expense Tracker Bot!\n\n"
@@ -164,7 +423,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "/categories - See available categories\n"
         "/spreadsheet - Open your expense spreadsheet\n"
         "/help - Get help with using the bot",
-        reply_markup=get_main_keyboard()
+        reply_markup=MAIN_KEYBOARD
     )
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -181,7 +440,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "3. Enter amount and description\n\n"
         "*Example:* 25.50 Groceries at Walmart",
         parse_mode="Markdown",
-        reply_markup=get_main_keyboard()
+        reply_markup=MAIN_KEYBOARD
     )
 
 async def handle_buttons(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -194,31 +453,16 @@ async def handle_buttons(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def show_categories(update: Update, context: ContextTypes.DEFAULT_TYPE):
     print("Categories command received!")
-    if not category_map:
-        setup_monthly_worksheet()
+    await ensure_categories_loaded()
     categories_list = "\n".join([f"• {category}" for category in category_map])
     await update.message.reply_text(
         f"Available expense categories:\n\n{categories_list}",
-        reply_markup=get_main_keyboard()
+        reply_markup=MAIN_KEYBOARD
     )
 
 async def open_spreadsheet(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handler for opening the spreadsheet on the current month tab"""
-    current_month_tab = get_current_month()  # Get current month dynamically
-    client = get_sheets_client()
-    sheet = client.open_by_key(SPREADSHEET_ID)
-    
-    # Ensure the current month worksheet exists
-    try:
-        worksheet = sheet.worksheet(current_month_tab)
-    except gspread.exceptions.WorksheetNotFound:
-        worksheet = sheet.add_worksheet(title=current_month_tab, rows=1000, cols=40)
-    
-    # Get the worksheet ID for the current month
-    worksheet_id = worksheet.id
-    
-    # Create URL that opens directly to the current month tab
-    spreadsheet_url = f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/edit#gid={worksheet_id}"
+    current_month_tab, spreadsheet_url = await run_blocking(get_spreadsheet_url)
     
     # Create an inline keyboard with the link
     keyboard = [[InlineKeyboardButton("Open Current Month", url=spreadsheet_url)]]
@@ -233,37 +477,23 @@ async def open_spreadsheet(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def expense_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     logging.info("Expense command received!")
-    if not category_map:
-        setup_monthly_worksheet()
+    await ensure_categories_loaded()
     
     if not category_map:
         # No categories found
         if update.message:
             await update.message.reply_text(
                 "❌ No categories found in your spreadsheet. Please add category headers in row 1.", 
-                reply_markup=get_main_keyboard()
+                reply_markup=MAIN_KEYBOARD
             )
         elif update.callback_query:
             await update.callback_query.message.reply_text(
                 "❌ No categories found in your spreadsheet. Please add category headers in row 1.",
-                reply_markup=get_main_keyboard()
+                reply_markup=MAIN_KEYBOARD
             )
         return ConversationHandler.END
 
-    # Create a keyboard with 2 categories per row
-    keyboard = []
-    row = []
-    
-    # Sort categories alphabetically for better user experience
-    sorted_categories = sorted(category_map.keys())
-    
-    for i, category in enumerate(sorted_categories):
-        row.append(InlineKeyboardButton(category, callback_data=f"cat_{category}"))
-        if len(row) == 2 or i == len(sorted_categories) - 1:
-            keyboard.append(row)
-            row = []
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = get_category_keyboard()
 
     # Determine how to respond (via /expense or button press)
     if update.message:
@@ -309,23 +539,9 @@ async def change_category_handler(update: Update, context: ContextTypes.DEFAULT_
         del context.user_data["category"]
     
     # Show category selection again
-    if not category_map:
-        setup_monthly_worksheet()
-    
-    # Create a keyboard with 2 categories per row
-    keyboard = []
-    row = []
-    
-    # Sort categories alphabetically for better user experience
-    sorted_categories = sorted(category_map.keys())
+    await ensure_categories_loaded()
     
-    for i, category in enumerate(sorted_categories):
-        row.append(InlineKeyboardButton(category, callback_data=f"cat_{category}"))
-        if len(row) == 2 or i == len(sorted_categories) - 1:
-            keyboard.append(row)
-            row = []
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = get_category_keyboard()
     
     await query.edit_message_text("Please select the expense category:", reply_markup=reply_markup)
     return CATEGORY
@@ -346,38 +562,42 @@ async def cancel_expense_handler(update: Update, context: ContextTypes.DEFAULT_T
     # Send new message with main keyboard
     await query.message.reply_text(
         "Use the keyboard below for quick access:",
-        reply_markup=get_main_keyboard()
+        reply_markup=MAIN_KEYBOARD
     )
     
     return ConversationHandler.END
 
 async def amount_and_description_entered(update: Update, context: ContextTypes.DEFAULT_TYPE):
     text = update.message.text
-    parts = text.split(' ', 1)
 
     try:
-        amount_str = parts[0].replace(',', '.')
-
-        description = parts[1] if len(parts) > 1 else ""
+        # Parse and validate the amount before any Google Sheets request is made
+        match = AMOUNT_PATTERN.match(text)
+        if not match:
+            raise ValueError(f"Invalid expense entry: {text}")
+        amount_str = match.group(1).replace(',', '.')
+        amount = float(amount_str)
+
+        description = match.group(2).strip()
         amount_description = f"{amount_str} {description}".strip()
 
         category = context.user_data["category"]
 
         try:
-            add_expense_to_sheet(category, amount_description)
+            await run_blocking(add_expense_to_sheet, category, amount, description)
             await update.message.reply_text(
                 f"✅ Expense added successfully!\n\n"
                 f"Category: {category}\n"
                 f"Entry: {amount_description}\n\n"
                 "Use the keyboard below to continue.",
-                reply_markup=get_main_keyboard()
+                reply_markup=MAIN_KEYBOARD
             )
         except Exception as e:
             logging.error(f"Error adding expense to sheets: {e}")
             await update.message.reply_text(
                 f"❌ Error saving expense: {str(e)}\n"
                 "Please try again.",
-                reply_markup=get_main_keyboard()
+                reply_markup=MAIN_KEYBOARD
             )
 
     except (ValueError, IndexError):
@@ -395,12 +615,12 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.callback_query.answer()
         await update.callback_query.message.reply_text(
             "Operation cancelled. What would you like to do next?",
-            reply_markup=get_main_keyboard()
+            reply_markup=MAIN_KEYBOARD
         )
     else:
         await update.message.reply_text(
             "Operation cancelled. What would you like to do next?",
-            reply_markup=get_main_keyboard()
+            reply_markup=MAIN_KEYBOARD
         )
     return ConversationHandler.END
 
@@ -408,9 +628,8 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def handle_text_messages(update: Update, context: ContextTypes.DEFAULT_TYPE):
     text = update.message.text
     
-    if text == "➕ Add Expense":
-        return await expense_start(update, context)
-    elif text == "📊 Categories":
+    # "➕ Add Expense" never reaches here, it is an entry point of the conversation handler
+    if text == "📊 Categories":
         await show_categories(update, context)
     elif text == "📝 Open Spreadsheet":
         await open_spreadsheet(update, context)
@@ -419,7 +638,7 @@ async def handle_text_messages(update: Update, context: ContextTypes.DEFAULT_TYP
     else:
         await update.message.reply_text(
             "I don't understand that command. Please use the keyboard or type / to see available commands.",
-            reply_markup=get_main_keyboard()
+            reply_markup=MAIN_KEYBOARD
         )
 
 
@@ -428,28 +647,53 @@ def main():
     
     # Create a post-init hook to set up commands
     async def post_init(application):
-        await application.bot.set_my_commands([
+        commands = [
             ("expense", "Add a new expense"),
             ("categories", "View available categories"), 
             ("spreadsheet", "Open your expense spreadsheet"),
             ("help", "Get help with using the bot")
-        ])
+        ]
+        # Include the bot identity so a different BOT_TOKEN on the same host still gets its commands
+        commands_payload = {"bot_id": application.bot.id, "commands": commands}
+        commands_hash = hashlib.sha256(json.dumps(commands_payload).encode("utf-8")).hexdigest()
+
+        # Skip the API call on restart if the same commands were already set
+        try:
+            with open(COMMANDS_HASH_FILE) as f:
+                if f.read().strip() == commands_hash:
+                    logging.info("Bot commands unchanged, skipping set_my_commands")
+                    return
+        except OSError:
+            pass
+
+        await application.bot.set_my_commands(commands)
+
+        try:
+            with open(COMMANDS_HASH_FILE, "w") as f:
+                f.write(commands_hash)
+        except OSError as e:
+            logging.warning(f"Could not store bot commands hash: {e}")
     
     # Add the post-init hook to the application
     application.post_init = post_init
 
     # Add command handlers
+    # Stateless handlers don't block, so a slow Sheets call doesn't hold up other updates;
+    # the expense conversation still processes updates one by one as ConversationHandler requires
     application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("categories", show_categories))
-    application.add_handler(CommandHandler("help", help_command))
-    application.add_handler(CommandHandler("spreadsheet", open_spreadsheet))
+    application.add_handler(CommandHandler("categories", show_categories, block=False))
+    application.add_handler(CommandHandler("help", help_command, block=False))
+    application.add_handler(CommandHandler("spreadsheet", open_spreadsheet, block=False))
+
+    # Single filter instance shared by the conversation entry point and the fallback text handler
+    add_expense_filter = filters.Text({"➕ Add Expense"})
 
     # Add conversation handler for adding expenses
     conv_handler = ConversationHandler(
     entry_points=[
         CommandHandler("expense", expense_start),
         CallbackQueryHandler(handle_buttons, pattern="^add_expense$"),
-        MessageHandler(filters.Text(["➕ Add Expense"]), expense_start)
+        MessageHandler(add_expense_filter, expense_start)
     ],
     states={
         CATEGORY: [
@@ -467,13 +711,23 @@ def main():
     
     # Handler for other text messages (keyboard buttons)
     application.add_handler(MessageHandler(
-        filters.TEXT & ~filters.COMMAND & ~filters.Text(["➕ Add Expense"]), 
-        handle_text_messages
+        filters.TEXT & ~filters.COMMAND & ~add_expense_filter, 
+        handle_text_messages,
+        block=False
     ))
 
+    # Authorize with Google once up front so the first user action doesn't pay for it
+    get_spreadsheet()
+
     print("Bot is starting...")
     try:
-        application.run_polling(allowed_updates=Update.ALL_TYPES)
+        # Long polling keeps each getUpdates request open instead of re-polling an idle bot
+        application.run_polling(
+            allowed_updates=Update.ALL_TYPES,
+            poll_interval=0.0,
+            timeout=50,
+            bootstrap_retries=-1
+        )
     except Exception as e:
         print(f"Error starting bot: {e}")
         logging.error(f"Error starting bot: {e}")